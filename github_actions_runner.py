@@ -5,56 +5,91 @@
 - RSS 抓取 (SSL 处理) → 处理去重 → AI 摘要(翻译+摘要) → 精美格式发送
 """
 
-import os, sys, yaml, logging, ssl, urllib.request, feedparser, requests
+import os, re, sys, yaml, logging, feedparser, requests
+import calendar, hashlib, json, shelve, threading, time
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlsplit
+from io import BytesIO
+from lxml import etree
 from typing import List, Dict, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml 不可用时退回纯 Python loader
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson 未安装时退回标准库
+    _json_loads = json.loads
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
-# Beijing timezone for display
-BJ_TIMEZONE = timezone(timedelta(hours=8))
-
 
-# ============== SSL 处理 ==============
-_orig_urlopen = urllib.request.urlopen
+@lru_cache(maxsize=4)
+def _load_config_cached(path: str, mtime: float) -> dict:
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    """加载 YAML 配置，优先使用 libyaml C loader
+
+    以 (路径, mtime) 为键缓存解析结果：同一进程内重复构造时不再
+    重新解析，文件一改 mtime 变化即自动失效。
+    """
+    return _load_config_cached(path, os.path.getmtime(path))
+
+# ============== HTTP 会话 ==============
+# 共享连接池：DeepSeek / Telegram 等对同一主机的多次请求复用 TCP+TLS 连接，
+# 并统一对 429/5xx 做指数退避重试
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        # 429 不在列表里：Telegram 的限流响应带 parameters.retry_after，
+        # 由 _send_chunk 按其指示等待重发，urllib3 吞掉就看不到了
+        status_forcelist=[500, 502, 503, 504],
+        # 默认不重试 POST；DeepSeek/Telegram 调用是幂等的，显式放开。
+        # 4xx（400/401/403/429）不在 forcelist 里，永远不重试。
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True
+    )
+))
 
-def _patched_urlopen(url, *a, **k):
-    """修复 SSL 和 URL 类型问题"""
-    try:
-        if isinstance(url, urllib.request.Request):
-            return _orig_urlopen(url, *a, **k, context=ssl_context)
-        return _orig_urlopen(url, *a, **k, context=ssl_context)
-    except Exception:
-        pass
-    
-    # Fallback: 直接使用 requests
-    if isinstance(url, urllib.request.Request):
-        url = url.full_url
-    try:
-        resp = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
-        return resp.raw
-    except:
-        return _orig_urlopen(url, *a, **k)
+# Beijing timezone for display
+BJ_TIMEZONE = timezone(timedelta(hours=8))
 
-urllib.request.urlopen = _patched_urlopen
 
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+# ============== 工具函数 ==============
+try:
+    # RE2 是 DFA 引擎：对源里偶发的畸形 HTML 没有回溯放大，装了就用
+    import re2
+    _TAG_RE = re2.compile(r'<[^>]+>')
+except ImportError:
+    _TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
 
 
-# ============== 工具函数 ==============
 def clean_text(text: str) -> str:
     """清理 HTML 标签和多余空格"""
     if not text:
         return ""
-    import re
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    # 大多数标题/摘要不含标签，直接跳过标签正则
+    if '<' not in text:
+        return _WS_RE.sub(' ', text).strip()
+    return _WS_RE.sub(' ', _TAG_RE.sub('', text)).strip()
 
 
 def safe_get(data: dict, *keys, default="") -> str:
@@ -67,20 +102,135 @@ def safe_get(data: dict, *keys, default="") -> str:
     return data if data else default
 
 
+# ============== 摘要缓存 ==============
+# GitHub Actions 每 8/12 小时运行一次，回看窗口重叠，大量条目重复出现。
+# 缓存持久化到 .cache/（配合 actions/cache 跨运行复用），命中即跳过 API 调用。
+_CACHE_DIR = ".cache"
+_CACHE_MAX_AGE = 7 * 24 * 3600  # 7 天
+
+_cache_lock = threading.Lock()
+
+
+def _open_summary_cache():
+    """打开摘要缓存，启动时清理过期条目"""
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        cache = shelve.open(os.path.join(_CACHE_DIR, "summaries.db"))
+        now = time.time()
+        for key in list(cache.keys()):
+            try:
+                _, ts = cache[key]
+                if now - ts > _CACHE_MAX_AGE:
+                    del cache[key]
+            except Exception:
+                del cache[key]
+        return cache
+    except Exception as e:
+        logger.debug(f"Summary cache unavailable: {e}")
+        return None
+
+
+_summary_cache = _open_summary_cache()
+
+
+def _summary_cache_key(title: str, url: str) -> str:
+    return hashlib.blake2b((title + url).encode(), digest_size=16).hexdigest()
+
+
+def _summary_cache_get(title: str, url: str) -> Optional[Dict[str, str]]:
+    if _summary_cache is None:
+        return None
+    with _cache_lock:
+        cached = _summary_cache.get(_summary_cache_key(title, url))
+    return cached[0] if cached else None
+
+
+def _summary_cache_put(title: str, url: str, result: Dict[str, str]) -> None:
+    if _summary_cache is None:
+        return
+    try:
+        with _cache_lock:
+            _summary_cache[_summary_cache_key(title, url)] = (result, time.time())
+    except Exception as e:
+        logger.debug(f"Summary cache write failed: {e}")
+
+
+# ============== 熔断器 ==============
+class CircuitBreaker:
+    """按主机的简易熔断器
+
+    某个主机连续失败达到阈值后进入 OPEN，冷却期内对它的调用直接
+    短路（调用方走降级路径），避免 5 个线程各自干等 15-30s 超时；
+    冷却期过后放行试探（HALF_OPEN），成功即恢复。
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            opened = self._opened_at.get(host)
+            if opened is None:
+                return True
+            # 冷却期结束，放行一次试探
+            return time.time() - opened >= self.recovery_timeout
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            count = self._failures.get(host, 0) + 1
+            self._failures[host] = count
+            if count >= self.failure_threshold:
+                if host not in self._opened_at:
+                    logger.warning(f"⚡ Circuit open for {host}")
+                self._opened_at[host] = time.time()
+
+
+BREAKER = CircuitBreaker()
+
+_DEEPSEEK_HOST = "api.deepseek.com"
+
+
+# ============== 线程池（舱壁隔离） ==============
+# 每个下游各用一个独立的有界线程池：某一路（比如慢的文章站点）
+# 打满自己的池子时，不会抢走 RSS 抓取或 DeepSeek 调用的线程。
+RSS_POOL = ThreadPoolExecutor(max_workers=5, thread_name_prefix="rss")
+ARTICLE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="article")
+LLM_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+
+
 # ============== AI 摘要模块 ==============
+
+
 def fetch_article_content(url: str) -> str:
     """获取文章正文内容"""
+    host = urlsplit(url).netloc
+    if not BREAKER.allow(host):
+        logger.debug(f"Circuit open, skipping article fetch: {host}")
+        return ""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml'
         }
-        response = requests.get(url, headers=headers, timeout=15)
+        response = SESSION.get(url, headers=headers, timeout=15, stream=True)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # 正文最终截断到 3000 字符，只读前 256 KB，不整页下载
+        raw = response.raw.read(256_000, decode_content=True)
+        response.close()
+
+        soup = BeautifulSoup(raw, 'lxml')
 
-        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'nav']):
+        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
             tag.decompose()
 
         content = None
@@ -99,24 +249,36 @@ def fetch_article_content(url: str) -> str:
         if not content:
             content = soup.find('body')
 
+        BREAKER.record_success(host)
+
         if content:
             text = content.get_text(separator=' ', strip=True)
             return clean_text(text)[:3000]
 
         return ""
     except Exception as e:
+        BREAKER.record_failure(host)
         logger.debug(f"Failed to fetch article: {e}")
         return ""
 
 
-def summarize_with_deepseek(title: str, summary: str, url: str = "") -> Dict[str, str]:
+def summarize_with_deepseek(title: str, summary: str, url: str = "",
+                            pre_fetched: str = "") -> Dict[str, str]:
     """使用 DeepSeek AI 翻译标题并生成摘要"""
     api_key = os.environ.get("DEEPSEEK_API_KEY")
     if not api_key:
         return {"title_cn": clean_text(title), "summary": clean_text(summary)[:150]}
 
+    cached = _summary_cache_get(title, url)
+    if cached:
+        return cached
+
+    # DeepSeek 熔断中：不排队等超时，直接走降级输出
+    if not BREAKER.allow(_DEEPSEEK_HOST):
+        return {"title_cn": clean_text(title), "summary": clean_text(summary)[:150]}
+
     try:
-        content = fetch_article_content(url) if url else ""
+        content = pre_fetched or (fetch_article_content(url) if url else "")
 
         if content:
             prompt = f"""请用中文完成以下任务：
@@ -125,10 +287,10 @@ def summarize_with_deepseek(title: str, summary: str, url: str = "") -> Dict[str
 2. 阅读文章内容，用不超过100个汉字总结文章要点（只保留与加密货币直接相关的内容）
 
 标题：{title}
-来源：{summary[:500]}
+来源：{summary[:200]}
 
 文章内容：
-{content[:2000]}
+{content[:800]}
 
 请用以下格式输出：
 标题翻译：[中文标题]
@@ -141,30 +303,32 @@ def summarize_with_deepseek(title: str, summary: str, url: str = "") -> Dict[str
 2. 根据标题和摘要生成一个不超过100字的摘要
 
 标题：{title}
-摘要：{summary[:500]}
+摘要：{summary[:200]}
 
 请用以下格式输出：
 标题翻译：[中文标题]
 摘要：[不超过100字的摘要]
 """
 
-        response = requests.post(
+        response = SESSION.post(
             "https://api.deepseek.com/chat/completions",
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {api_key}"
             },
             json={
-                "model": "deepseek-chat",
+                "model": os.environ.get("DEEPSEEK_MODEL", "deepseek-chat"),
                 "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 300,
-                "temperature": 0.3
+                "max_tokens": 200,
+                "temperature": 0.3,
+                "stream": False
             },
             timeout=30
         )
 
         if response.status_code == 200:
-            data = response.json()
+            BREAKER.record_success(_DEEPSEEK_HOST)
+            data = _json_loads(response.content)
             if data.get("choices") and len(data["choices"]) > 0:
                 result = data["choices"][0]["message"]["content"].strip()
 
@@ -178,16 +342,308 @@ def summarize_with_deepseek(title: str, summary: str, url: str = "") -> Dict[str
                     elif line.startswith('摘要：'):
                         summary_cn = line.replace('摘要：', '').strip()
 
-                return {"title_cn": title_cn, "summary": summary_cn}
+                result = {"title_cn": title_cn, "summary": summary_cn}
+                _summary_cache_put(title, url, result)
+                return result
 
     except Exception as e:
+        BREAKER.record_failure(_DEEPSEEK_HOST)
         logger.debug(f"DeepSeek API error: {e}")
 
     return {"title_cn": clean_text(title), "summary": clean_text(summary)[:150]}
 
 
+# 已推送条目的跨运行去重：回看窗口重叠时，上次简报里的文章不再重复处理
+_SEEN_PATH = os.path.join(_CACHE_DIR, "seen.json")
+_SEEN_MAX = 5000
+
+
+def _seen_key(article: Dict) -> str:
+    return hashlib.sha1((article.get("url") or article.get("title", "")).encode()).hexdigest()
+
+
+def _load_seen() -> List[str]:
+    try:
+        with open(_SEEN_PATH, "r") as f:
+            return json.load(f)
+    except Exception:
+        return []
+
+
+def _save_seen(seen_list: List[str]) -> None:
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(_SEEN_PATH, "w") as f:
+            json.dump(seen_list[-_SEEN_MAX:], f)
+    except Exception as e:
+        logger.debug(f"Seen list save failed: {e}")
+
+
+def _mark_pushed(articles: List[Dict]) -> None:
+    """把文章记为已推送——只在 Telegram 发送成功后调用
+
+    发送失败时不落盘，这批文章下个周期还会重新入选；
+    否则订阅者没收到的简报就永远丢了。
+    """
+    seen_list = _load_seen()
+    seen_list.extend(_seen_key(a) for a in articles)
+    _save_seen(seen_list)
+
+
+def _dedup_articles(articles: List[Dict]) -> List[Dict]:
+    """跨源去重：按规范化 URL 和标题哈希只保留一份
+
+    聚合器经常转发同一故事，不去重会白白消耗 DeepSeek 调用
+    并在简报里出现重复条目。O(N) 集合查找。
+
+    按源优先级从高到低遍历，重复时留下的总是优先级最高的那份
+    （最终排序在 fetch_all 里统一做，这里的顺序不对外暴露）。
+    """
+    seen_urls = set()
+    seen_titles = set()
+    unique = []
+
+    for article in sorted(articles, key=lambda a: -a.get("priority", 3)):
+        url = article.get("url", "")
+        canon = urlsplit(url)._replace(query='', fragment='').geturl().rstrip('/') if url else ""
+        title_key = hashlib.blake2b(
+            clean_text(article.get("title", "")).lower().encode(), digest_size=16
+        ).digest()
+
+        if (canon and canon in seen_urls) or title_key in seen_titles:
+            continue
+        if canon:
+            seen_urls.add(canon)
+        seen_titles.add(title_key)
+        unique.append(article)
+
+    removed = len(articles) - len(unique)
+    if removed:
+        logger.info(f"   🔁 Removed {removed} cross-feed duplicates")
+    return unique
+
+
+# 每个批量请求的条数：太多会把输出 token 预算摊薄，JSON 回复被截断
+# 后整批解析失败；6 条时 200 token/条 的输出上限绰绰有余
+_SUMMARY_BATCH_SIZE = 6
+
+
+def _summarize_batch_request(articles: List[Dict], api_key: str) -> List[Dict]:
+    """单次请求批量生成全部标题翻译和摘要
+
+    把 N 条新闻打包进一个 JSON-mode 请求，N 次 LLM 往返变成一次。
+    返回批量结果里缺失或解析失败、仍需逐条处理的文章。
+    """
+    # 正文抓取并发进行，批量 prompt 可以带上每篇的开头段落；
+    # feed 自带全文 (content:encoded) 的条目不用再抓
+    contents = list(ARTICLE_POOL.map(
+        lambda a: a.get("content") or (fetch_article_content(a["url"]) if a.get("url") else ""),
+        articles
+    ))
+
+    numbered = []
+    for i, (article, content) in enumerate(zip(articles, contents), 1):
+        block = f"[{i}] 标题：{article['title']}\n摘要：{clean_text(article['summary'])[:200]}"
+        if content:
+            block += f"\n内容：{content[:800]}"
+        numbered.append(block)
+
+    prompt = (
+        "请为以下每条加密货币新闻完成两件事：把标题翻译成不超过25字的中文，"
+        "并生成不超过100字的中文摘要。严格按此 JSON 格式输出：\n"
+        '{"items": [{"id": 1, "title_cn": "...", "summary": "..."}]}\n\n'
+        + "\n\n".join(numbered)
+    )
+
+    if not BREAKER.allow(_DEEPSEEK_HOST):
+        return articles
+
+    try:
+        response = SESSION.post(
+            "https://api.deepseek.com/chat/completions",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}"
+            },
+            json={
+                "model": os.environ.get("DEEPSEEK_MODEL", "deepseek-chat"),
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": 200 * len(articles),
+                "temperature": 0.3,
+                "stream": False,
+                "response_format": {"type": "json_object"}
+            },
+            timeout=120
+        )
+        if response.status_code != 200:
+            return articles
+
+        data = _json_loads(response.content)
+        content = data["choices"][0]["message"]["content"]
+        by_id = {}
+        for item in json.loads(content).get("items", []):
+            try:
+                by_id[int(item["id"])] = item
+            except (KeyError, TypeError, ValueError):
+                continue
+    except Exception as e:
+        logger.debug(f"Batch summarize failed: {e}")
+        return articles
+
+    pending = []
+    for i, article in enumerate(articles, 1):
+        item = by_id.get(i)
+        if item and item.get("title_cn") and item.get("summary"):
+            article["title_cn"] = clean_text(str(item["title_cn"]))
+            article["summary"] = clean_text(str(item["summary"]))
+            _summary_cache_put(article["title"], article["url"], {
+                "title_cn": article["title_cn"],
+                "summary": article["summary"]
+            })
+        else:
+            pending.append(article)
+    return pending
+
+
+def summarize_batch(articles: List[Dict]) -> None:
+    """为整批文章生成翻译和摘要
+
+    优先把整批打包成一次 DeepSeek JSON 请求；批量失败或遗漏的条目
+    退回逐条调用，并发执行兜底。
+    """
+    if not articles:
+        return
+
+    # 上次运行已摘要过的条目直接从持久缓存取，不进批量请求
+    pending = []
+    for article in articles:
+        cached = _summary_cache_get(article["title"], article["url"])
+        if cached:
+            article["title_cn"] = cached["title_cn"]
+            article["summary"] = cached["summary"]
+        else:
+            pending.append(article)
+    hits = len(articles) - len(pending)
+    if hits:
+        logger.info(f"   💾 Summary cache hit for {hits}/{len(articles)} articles")
+    if not pending:
+        return
+
+    api_key = os.environ.get("DEEPSEEK_API_KEY")
+    if api_key and len(pending) > 1:
+        batch_total = len(pending)
+        # 按固定批次切分，而不是全部塞进一个请求
+        still_pending = []
+        for i in range(0, len(pending), _SUMMARY_BATCH_SIZE):
+            batch = pending[i:i + _SUMMARY_BATCH_SIZE]
+            still_pending.extend(_summarize_batch_request(batch, api_key))
+        pending = still_pending
+        done = batch_total - len(pending)
+        if done:
+            logger.info(f"   🤖 Batch summarized {done}/{batch_total} articles")
+
+    if not pending:
+        return
+
+    futures = {
+        LLM_POOL.submit(summarize_with_deepseek, a["title"], a["summary"], a["url"],
+                        a.get("content", "")): a
+        for a in pending
+    }
+
+    for future in as_completed(futures):
+        article = futures[future]
+        try:
+            ai_result = future.result()
+        except Exception as e:
+            logger.debug(f"Summarize failed: {e}")
+            ai_result = {
+                "title_cn": clean_text(article["title"]),
+                "summary": clean_text(article["summary"])[:150]
+            }
+        article["title_cn"] = ai_result["title_cn"]
+        article["summary"] = ai_result["summary"]
+
+
 # ============== RSS 抓取模块 ==============
-def fetch_single_feed(feed: dict, cutoff_time, crypto_keywords: List[str]) -> List[Dict]:
+MAX_FEED_ENTRIES = 30
+
+# 各源的 ETag / Last-Modified，跨运行持久化后未变化的源直接拿 304 跳过
+_FEED_STATE_PATH = os.path.join(_CACHE_DIR, "feeds.json")
+
+
+def _load_feed_state() -> Dict:
+    try:
+        with open(_FEED_STATE_PATH, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_feed_state(state: Dict) -> None:
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(_FEED_STATE_PATH, "w") as f:
+            json.dump(state, f)
+    except Exception as e:
+        logger.debug(f"Feed state save failed: {e}")
+
+
+def _parse_feed_stream(content: bytes, max_entries: int = MAX_FEED_ENTRIES) -> Optional[List[Dict]]:
+    """流式解析 RSS <item>，最多取前 max_entries 条
+
+    只提取 title/link/description/pubDate 四个字段，取够即停，
+    跳过 feedparser 对整棵树的 sanitize 开销。Atom 或异常格式返回
+    None，由调用方回退到 feedparser。
+    """
+    entries = []
+    try:
+        for _, elem in etree.iterparse(BytesIO(content), events=('end',), tag='item'):
+            entries.append({
+                "title": elem.findtext("title") or "",
+                "link": elem.findtext("link") or "",
+                "summary": elem.findtext("description") or "",
+                "published": elem.findtext("pubDate") or "",
+                "content": elem.findtext(
+                    "{http://purl.org/rss/1.0/modules/content/}encoded") or "",
+            })
+            elem.clear()
+            if len(entries) >= max_entries:
+                break
+    except Exception as e:
+        logger.debug(f"Streaming parse failed: {e}")
+        return None
+    return entries or None
+
+
+def _parse_entry_date(entry) -> Optional[datetime]:
+    """解析条目发布时间为北京时间；无法解析返回 None
+
+    优先走 parsedate_to_datetime 的 RFC-822 快路径（流式解析和
+    feedparser 条目都带原始 published 字符串），仅在字符串缺失时
+    才退回 struct_time 元组。
+    """
+    published = entry.get("published")
+    if published:
+        try:
+            dt = parsedate_to_datetime(published)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.astimezone(BJ_TIMEZONE)
+        except Exception:
+            pass
+    parsed = entry.get("published_parsed")
+    if parsed:
+        try:
+            # 一步到位：不构造中间 UTC datetime 再 astimezone
+            return datetime.fromtimestamp(calendar.timegm(parsed), BJ_TIMEZONE)
+        except Exception:
+            pass
+    return None
+
+
+def fetch_single_feed(feed: dict, cutoff_time, kw_re: Optional[re.Pattern],
+                      feed_state: Optional[Dict] = None) -> List[Dict]:
     """单线程抓取单个 RSS 源"""
     url = feed.get("url", "")
     name = feed.get("name", "Unknown")
@@ -198,61 +654,94 @@ def fetch_single_feed(feed: dict, cutoff_time, crypto_keywords: List[str]) -> Li
     try:
         logger.info(f"📡 Fetching: {name}")
 
-        # 使用 requests 获取内容
-        resp = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
+        # 条件请求：源未更新时服务器直接返回 304，免下载免解析
+        headers = {
+            'User-Agent': 'Mozilla/5.0',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        prev = feed_state.get(url, {}) if feed_state is not None else {}
+        if prev.get("etag"):
+            headers['If-None-Match'] = prev["etag"]
+        if prev.get("last_modified"):
+            headers['If-Modified-Since'] = prev["last_modified"]
+
+        resp = SESSION.get(url, headers=headers, timeout=15, stream=True)
+
+        if resp.status_code == 304:
+            resp.close()
+            logger.info(f"   ↻ Not modified")
+            return []
 
         if resp.status_code != 200:
+            resp.close()
             logger.warning(f"   ✗ HTTP {resp.status_code}")
             return []
 
-        feed_data = feedparser.parse(resp.content)
-
-        if not feed_data.entries:
+        if feed_state is not None:
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+            if etag or last_modified:
+                with _cache_lock:
+                    feed_state[url] = {"etag": etag, "last_modified": last_modified}
+
+        # 只要前 30 条，正常 feed 远小于 8 MB；超过的直接截断，
+        # 防止异常大的响应把内存吃满
+        content = resp.raw.read(8_000_000, decode_content=True)
+        resp.close()
+
+        entries = _parse_feed_stream(content)
+        if entries is None:
+            # Atom 或异常格式，回退 feedparser 全量解析
+            feed_data = feedparser.parse(content)
+            entries = feed_data.entries[:MAX_FEED_ENTRIES]
+
+        if not entries:
             logger.warning(f"   ✗ No entries")
             return []
 
+        # 循环体只有 .get / 正则 / 日期解析（各自兜底），不需要每条
+        # 一个 try/except 帧；整个函数已有外层兜底
         count = 0
-        for entry in feed_data.entries[:30]:
-            try:
+        for entry in entries:
+            pub_date = _parse_entry_date(entry)
+            if pub_date is None:
                 pub_date = datetime.now(BJ_TIMEZONE)
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    try:
-                        utc_dt = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                        pub_date = utc_dt.astimezone(BJ_TIMEZONE)
-                    except:
-                        pass
-                    if pub_date < cutoff_time:
-                        continue
-
-                title = safe_get(entry, "title", default="")
-                if not title:
-                    continue
+            elif pub_date < cutoff_time:
+                continue
 
-                summary = safe_get(entry, "summary", default="") or safe_get(entry, "description", default="")
-                url = safe_get(entry, "link", default="")
-
-                # 过滤加密货币关键词
-                if not crypto_only:
-                    text = (title + " " + summary).lower()
-                    if not any(kw.lower() in text for kw in crypto_keywords):
-                        continue
-
-                # AI 摘要
-                ai_result = summarize_with_deepseek(title, summary, url)
-
-                articles.append({
-                    "title": title,
-                    "title_cn": ai_result["title_cn"],
-                    "summary": ai_result["summary"],
-                    "source": name,
-                    "url": url,
-                    "published": pub_date,
-                    "priority": priority
-                })
-                count += 1
-            except Exception:
+            title = safe_get(entry, "title", default="")
+            if not title:
                 continue
 
+            summary = safe_get(entry, "summary", default="") or safe_get(entry, "description", default="")
+            url = safe_get(entry, "link", default="")
+
+            # feed 自带全文（content:encoded）足够长时，后面就不用再抓原文页
+            full = entry.get("content") or ""
+            if isinstance(full, list):  # feedparser 格式：[{'value': ...}]
+                full = (full[0] or {}).get("value", "") if full else ""
+            full = clean_text(full)
+            if len(full) <= 1200:
+                full = ""
+
+            # 过滤加密货币关键词（单次正则扫描代替逐词子串搜索）
+            if not crypto_only and kw_re is not None:
+                if not kw_re.search(title) and not kw_re.search(summary):
+                    continue
+
+            # AI 摘要延后到 fetch_all 统一批量处理
+            articles.append({
+                "title": title,
+                "title_cn": clean_text(title),
+                "summary": summary,
+                "content": full[:3000],
+                "source": name,
+                "url": url,
+                "published": pub_date,
+                "priority": priority
+            })
+            count += 1
+
         logger.info(f"   ✓ Found {count} crypto articles")
         return articles
 
@@ -268,24 +757,54 @@ class RSSFetcher:
         self.feeds = config.get("rss_sources", [])
         self.lookback_hours = config.get("processing", {}).get("hours_lookback", 12)
 
+        # 关键词过滤编译成单个不区分大小写的正则，每条目一次线性扫描
+        crypto_keywords = config.get("crypto_keywords", [])
+        self._kw_re = re.compile(
+            '|'.join(re.escape(kw) for kw in crypto_keywords),
+            re.IGNORECASE
+        ) if crypto_keywords else None
+
     def fetch_all(self) -> List[Dict]:
         articles = []
         cutoff_time = datetime.now(BJ_TIMEZONE) - timedelta(hours=self.lookback_hours)
-        crypto_keywords = self.config.get("crypto_keywords", [])
 
         # 过滤启用的源
         enabled_feeds = [f for f in self.feeds if f.get("enabled", True)]
+        if not enabled_feeds:
+            return []
 
-        # 并行抓取 (最多 5 个并发)
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {
-                executor.submit(fetch_single_feed, feed, cutoff_time, crypto_keywords): feed
-                for feed in enabled_feeds
-            }
+        feed_state = _load_feed_state()
+
+        # 并行抓取（RSS 专用池，最多 5 个并发）
+        futures = {
+            RSS_POOL.submit(fetch_single_feed, feed, cutoff_time, self._kw_re, feed_state): feed
+            for feed in enabled_feeds
+        }
+
+        for future in as_completed(futures):
+            feed = futures[future]
+            try:
+                articles.extend(future.result())
+            except Exception as e:
+                # 单个源异常不影响整批
+                logger.error(f"   ✗ {feed.get('name', 'Unknown')} failed: {str(e)[:50]}")
+
+        # 丢弃已不在配置中的源，状态文件不随历史源无限增长
+        feed_urls = {f.get("url", "") for f in enabled_feeds}
+        _save_feed_state({u: v for u, v in feed_state.items() if u in feed_urls})
+
+        # 跨源去重 + 跳过上次已推送的条目，再做 AI 摘要（并发批量）
+        articles = _dedup_articles(articles)
+
+        seen = set(_load_seen())
+        if seen:
+            before = len(articles)
+            articles = [a for a in articles if _seen_key(a) not in seen]
+            skipped = before - len(articles)
+            if skipped:
+                logger.info(f"   🔁 Skipped {skipped} already-pushed articles")
 
-            for future in as_completed(futures):
-                feed_articles = future.result()
-                articles.extend(feed_articles)
+        summarize_batch(articles)
 
         # 统计多源验证（同一URL被多少源报道）
         url_pattern_count = {}
@@ -398,20 +917,24 @@ class RSSFetcher:
 
         max_articles = self.config.get("processing", {}).get("max_articles", 10)
         logger.info(f"📊 Total: {len(articles)} articles (top {max_articles} by importance)")
-        return articles[:max_articles]
+        selected = articles[:max_articles]
+
+        # 已推送标记由 main() 在发送成功后写入（_mark_pushed），
+        # 这里只负责选取；落选的下个周期仍有机会
+        return selected
 
 
 # ============== 价格获取模块 ==============
 def fetch_btc_price() -> Dict:
     """获取 BTC 价格"""
     try:
-        resp = requests.get(
+        resp = SESSION.get(
             "https://api.coingecko.com/api/v3/simple/price",
             params={"ids": "bitcoin", "vs_currencies": "usd", "include_24hr_change": "true"},
             timeout=10
         )
         if resp.status_code == 200:
-            data = resp.json()
+            data = _json_loads(resp.content)
             btc = data.get("bitcoin", {})
             return {
                 "price": btc.get("usd", 0),
@@ -428,34 +951,60 @@ def format_briefing(articles: List[Dict], prices: Dict = None) -> str:
     if not articles:
         return "📰 *加密新闻简报*\n\n本周期未找到新文章。"
 
-    lines = []
-
-    lines.append("*加密新闻简报*")
-    lines.append(datetime.now(BJ_TIMEZONE).strftime('%Y-%m-%d %H:%M'))
-    lines.append("")
-
-    if prices and prices.get("price"):
-        change = prices.get("change_24h", 0)
-        change_str = f"{change:+.2f}%" if change else ""
-        lines.append(f"*₿ ${prices['price']:,.0f} {change_str}*")
-        lines.append("")
-
-    for i, article in enumerate(articles, 1):
-        title = article.get("title_cn", article.get("title", ""))
-        summary = article.get("summary", "")
-        source = article.get("source", "Unknown")
-        url = article.get("url", "")
-        time_str = article["published"].strftime("%H:%M")
-
-        lines.append(f"*{i} {title}*")
-        lines.append(f"{summary}")
-        if url:
-            lines.append(f"[{source}]({url}) | {time_str}")
+    def _emit():
+        yield "*加密新闻简报*"
+        yield datetime.now(BJ_TIMEZONE).strftime('%Y-%m-%d %H:%M')
+        yield ""
+
+        if prices and prices.get("price"):
+            change = prices.get("change_24h", 0)
+            change_str = f"{change:+.2f}%" if change else ""
+            yield f"*₿ ${prices['price']:,.0f} {change_str}*"
+            yield ""
+
+        for i, article in enumerate(articles, 1):
+            title = article.get("title_cn", article.get("title", ""))
+            source = article.get("source", "Unknown")
+            url = article.get("url", "")
+            time_str = article["published"].strftime("%H:%M")
+
+            yield f"*{i} {title}*"
+            yield article.get("summary", "")
+            if url:
+                yield f"[{source}]({url}) | {time_str}"
+            else:
+                yield f"_{source} | {time_str}_"
+            yield ""
+
+    return "\n".join(_emit())
+
+
+def _chunk_message(message: str, limit: int = 4000):
+    """按行切分长消息，单次遍历
+
+    不在行中间断开，避免劈开 Markdown 链接导致 Telegram 拒收；
+    也不再做 message[i:i+4000] 式的大段切片拷贝。
+    """
+    buf = []
+    size = 0
+    for line in message.split("\n"):
+        line_len = len(line) + 1
+        if line_len > limit:
+            # 超长单行（理论上不会出现）只能硬切
+            if buf:
+                yield "\n".join(buf)
+                buf, size = [], 0
+            for i in range(0, len(line), limit):
+                yield line[i:i + limit]
+            continue
+        if size + line_len > limit and buf:
+            yield "\n".join(buf)
+            buf, size = [line], line_len
         else:
-            lines.append(f"_{source} | {time_str}_")
-        lines.append("")
-
-    return "\n".join(lines)
+            buf.append(line)
+            size += line_len
+    if buf:
+        yield "\n".join(buf)
 
 
 def send_to_telegram(articles: List[Dict], prices: Dict = None) -> bool:
@@ -470,40 +1019,48 @@ def send_to_telegram(articles: List[Dict], prices: Dict = None) -> bool:
     message = format_briefing(articles, prices)
     logger.info("📤 Sending to Telegram...")
 
+    # 不变部分只构造一次
+    api_url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
+    base_payload = {
+        "chat_id": CHAT_ID,
+        "parse_mode": "Markdown",
+        "disable_web_page_preview": True
+    }
+
+    def _send_chunk(text: str) -> bool:
+        payload = {**base_payload, "text": text}
+        try:
+            resp = SESSION.post(api_url, json=payload, timeout=30)
+            if resp.status_code == 429:
+                # Telegram 对单个 chat 限流 ~1 msg/s，按它说的等再重发一次
+                try:
+                    retry_after = _json_loads(resp.content)["parameters"]["retry_after"]
+                except Exception:
+                    retry_after = 3
+                time.sleep(min(retry_after, 30))
+                resp = SESSION.post(api_url, json=payload, timeout=30)
+            return resp.status_code == 200
+        except requests.RequestException as e:
+            # SESSION 的 5xx 重试耗尽后会抛 RetryError——发送失败照旧走
+            # 日志 + return False，不让异常穿透 main()
+            logger.error(f"Telegram request failed: {e}")
+            return False
+
+    # 同一 chat 的分片串行发送：保证顺序，也不触发 per-chat 限流；
+    # 连接经 SESSION 复用，不再有每片的 TLS 握手
     if len(message) > 4000:
-        chunks = [message[i:i+4000] for i in range(0, len(message), 4000)]
+        chunks = list(_chunk_message(message))
         for i, chunk in enumerate(chunks, 1):
-            resp = requests.post(
-                f"https://api.telegram.org/bot{TOKEN}/sendMessage",
-                json={
-                    "chat_id": CHAT_ID,
-                    "text": chunk,
-                    "parse_mode": "Markdown",
-                    "disable_web_page_preview": True
-                },
-                timeout=30
-            )
-            if resp.status_code != 200:
-                logger.error(f"Failed chunk {i}: {resp.status_code}")
+            if not _send_chunk(chunk):
+                logger.error(f"Failed to send chunk {i}/{len(chunks)}")
                 return False
     else:
-        resp = requests.post(
-            f"https://api.telegram.org/bot{TOKEN}/sendMessage",
-            json={
-                "chat_id": CHAT_ID,
-                "text": message,
-                "parse_mode": "Markdown",
-                "disable_web_page_preview": True
-            },
-            timeout=30
-        )
+        if not _send_chunk(message):
+            logger.error("Failed to send")
+            return False
 
-    if resp.status_code == 200:
-        logger.info(f"✓ Successfully sent {len(articles)} articles to Telegram!")
-        return True
-    else:
-        logger.error(f"Failed to send: {resp.status_code}")
-        return False
+    logger.info(f"✓ Successfully sent {len(articles)} articles to Telegram!")
+    return True
 
 
 # ============== 主函数 ==============
@@ -517,15 +1074,12 @@ def main():
     if not os.environ.get("DEEPSEEK_API_KEY"):
         logger.warning("⚠️ DEEPSEEK_API_KEY not set")
 
-    with open("config.yaml", "r") as f:
-        config = yaml.safe_load(f)
+    config = load_config()
 
-    logger.info("📊 Step 0: Fetching market prices...")
-    prices = fetch_btc_price()
-    if prices.get("price"):
-        change = prices.get("change_24h", 0)
-        change_str = f"{change:+.2f}%" if change else ""
-        logger.info(f"   BTC: ${prices['price']:,.0f} {change_str}")
+    # 价格抓取与 RSS 抓取相互独立，放到后台线程并行执行
+    logger.info("📊 Step 0: Fetching market prices (background)...")
+    price_executor = ThreadPoolExecutor(max_workers=1)
+    price_future = price_executor.submit(fetch_btc_price)
 
     logger.info("\n📥 Step 1: Fetching RSS feeds (parallel)...")
     fetcher = RSSFetcher(config)
@@ -533,6 +1087,7 @@ def main():
 
     if not articles:
         logger.warning("No articles found!")
+        price_executor.shutdown(wait=False)
         return
 
     print()
@@ -541,8 +1096,18 @@ def main():
         logger.info(f"   {i}. {a['title_cn'][:40]}... ({a['source']})")
     print()
 
+    # 发送前才收取价格结果：价格抓取与整个 RSS+摘要阶段完全重叠
+    prices = price_future.result()
+    price_executor.shutdown()
+    if prices.get("price"):
+        change = prices.get("change_24h", 0)
+        change_str = f"{change:+.2f}%" if change else ""
+        logger.info(f"   BTC: ${prices['price']:,.0f} {change_str}")
+
     logger.info("📤 Step 2: Sending to Telegram...")
     if send_to_telegram(articles, prices):
+        # 发送成功才记已推送，失败的批次下次照常重新入选
+        _mark_pushed(articles)
         print("=" * 60)
         print("✅ Done! Check Telegram for the briefing.")
         print("=" * 60)
@@ -3,6 +3,8 @@ News Processor Module
 Handles article deduplication, filtering, and ranking
 """
 
+import heapq
+import json
 import logging
 import sqlite3
 from datetime import datetime, timedelta, timezone
@@ -37,10 +39,14 @@ class NewsProcessor:
         """Initialize SQLite database for deduplication"""
         import os
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+
+        # One long-lived connection instead of connect/close per query;
+        # WAL lets reads and the nightly cleanup overlap without locking
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        cursor = self.conn.cursor()
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS articles (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -63,18 +69,29 @@ class NewsProcessor:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_url_hash ON articles(url_hash)"
+        )
+
+        self.conn.commit()
         logger.info(f"Database initialized: {self.db_path}")
 
+    def close(self):
+        """Close the database connection"""
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def __del__(self):
+        self.close()
+
     def get_last_push_timestamp(self) -> datetime:
         """Get the timestamp of the last successful push"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
 
         cursor.execute("SELECT value FROM metadata WHERE key = 'last_push_timestamp'")
         result = cursor.fetchone()
-        conn.close()
 
         if result:
             return datetime.fromisoformat(result[0])
@@ -84,79 +101,70 @@ class NewsProcessor:
 
     def set_last_push_timestamp(self, timestamp: datetime):
         """Set the timestamp of the last successful push"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        self.conn.execute(
             "INSERT OR REPLACE INTO metadata (key, value, updated_at) VALUES (?, ?, ?)",
             ('last_push_timestamp', timestamp.isoformat(), datetime.now(BJ_TIMEZONE))
         )
+        self.conn.commit()
 
-        conn.commit()
-        conn.close()
-    
-    def is_duplicate(self, article: Dict) -> bool:
-        """Check if article already exists in database"""
-        if not self.deduplication:
-            return False
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT id FROM articles WHERE url_hash = ?",
-            (article['hash'],)
-        )
-        
-        exists = cursor.fetchone() is not None
-        conn.close()
-        
-        return exists
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """Return the subset of hashes already stored, in one query
+
+        One SELECT ... IN per 500 hashes (SQLite parameter limit)
+        instead of a round trip per article.
+        """
+        if not self.deduplication or not hashes:
+            return set()
+
+        found: Set[str] = set()
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT url_hash FROM articles WHERE url_hash IN ({placeholders})",
+                chunk
+            )
+            found.update(row[0] for row in cursor)
+        return found
     
     def mark_processed(self, articles: List[Dict]):
         """Mark articles as processed in database"""
         if not self.deduplication:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for article in articles:
-            try:
-                cursor.execute(
+        rows = [
+            (a['hash'], a['url'], a['title'], a['source'], a['published'])
+            for a in articles
+        ]
+        try:
+            # One transaction, parameters bound in C
+            with self.conn:
+                self.conn.executemany(
                     "INSERT OR IGNORE INTO articles (url_hash, url, title, source, published_at) VALUES (?, ?, ?, ?, ?)",
-                    (
-                        article['hash'],
-                        article['url'],
-                        article['title'],
-                        article['source'],
-                        article['published']
-                    )
+                    rows
                 )
-            except Exception as e:
-                logger.warning(f"Failed to mark article: {e}")
-        
-        conn.commit()
-        conn.close()
-    
+        except Exception as e:
+            logger.warning(f"Failed to mark articles: {e}")
+
     def cleanup_old_articles(self, days: int = 7):
         """Remove articles older than N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         cutoff = datetime.now(BJ_TIMEZONE) - timedelta(days=days)
-        cursor.execute("DELETE FROM articles WHERE created_at < ?", (cutoff,))
-        
+        cursor = self.conn.execute("DELETE FROM articles WHERE created_at < ?", (cutoff,))
+
         deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
+        self.conn.commit()
+
         if deleted > 0:
             logger.info(f"Cleaned up {deleted} old articles")
     
-    def calculate_recency_score(self, article: Dict) -> float:
-        """Calculate recency score (0-1)"""
-        now = datetime.now(BJ_TIMEZONE)
+    def calculate_recency_score(self, article: Dict, now: datetime = None) -> float:
+        """Calculate recency score (0-1)
+
+        Batch callers pass `now` once instead of reading the clock per
+        article.
+        """
+        if now is None:
+            now = datetime.now(BJ_TIMEZONE)
         hours_old = (now - article['published']).total_seconds() / 3600
         
         # Exponential decay: very recent = high score
@@ -182,9 +190,9 @@ class NewsProcessor:
         # Normalize: assume 1000+ engagement = max score
         return min(engagement / 1000.0, 1.0)
     
-    def calculate_ranking_score(self, article: Dict) -> float:
+    def calculate_ranking_score(self, article: Dict, now: datetime = None) -> float:
         """Calculate overall ranking score"""
-        recency = self.calculate_recency_score(article)
+        recency = self.calculate_recency_score(article, now)
         source = self.calculate_source_score(article)
         engagement = self.calculate_engagement_score(article)
         
@@ -196,9 +204,10 @@ class NewsProcessor:
     
     def rank_articles(self, articles: List[Dict]) -> List[Dict]:
         """Rank and sort articles"""
-        scored = [(self.calculate_ranking_score(a), a) for a in articles]
+        now = datetime.now(BJ_TIMEZONE)
+        scored = [(self.calculate_ranking_score(a, now), a) for a in articles]
         scored.sort(key=lambda x: -x[0])
-        
+
         return [a for score, a in scored]
     
     def deduplicate_articles(self, articles: List[Dict]) -> List[Dict]:
@@ -223,12 +232,19 @@ class NewsProcessor:
         
         # Deduplicate
         articles = self.deduplicate_articles(articles)
-        
-        # Rank
-        articles = self.rank_articles(articles)
-        
-        # Limit count
-        articles = articles[:self.max_articles]
+
+        # Drop articles already pushed in earlier runs (single bulk query)
+        seen = self.existing_hashes([a['hash'] for a in articles])
+        if seen:
+            before = len(articles)
+            articles = [a for a in articles if a['hash'] not in seen]
+            logger.info(f"Skipped {before - len(articles)} previously processed articles")
+
+        # Rank and limit in one pass: top-k heap is O(N log k) vs a
+        # full O(N log N) sort that we'd slice anyway
+        now = datetime.now(BJ_TIMEZONE)
+        articles = heapq.nlargest(self.max_articles, articles,
+                                  key=lambda a: self.calculate_ranking_score(a, now))
         
         # Mark as processed
         self.mark_processed(articles)
@@ -237,10 +253,19 @@ class NewsProcessor:
         return articles
 
 
+# Reuse processors across convenience-function calls: skips the SQLite
+# open + DDL round trip when invoked repeatedly with the same config
+_PROCESSOR_CACHE: Dict[str, NewsProcessor] = {}
+
+
 # Convenience function
 def process_articles(articles: List[Dict], config: dict = None) -> List[Dict]:
     """Process articles (convenience function)"""
-    processor = NewsProcessor(config or {})
+    key = json.dumps(config or {}, sort_keys=True, default=str)
+    processor = _PROCESSOR_CACHE.get(key)
+    if processor is None:
+        processor = NewsProcessor(config or {})
+        _PROCESSOR_CACHE[key] = processor
     return processor.filter_and_process(articles)
 
 
@@ -6,8 +6,12 @@ Fetches real-time prices for Bitcoin and USD Index
 import logging
 import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +22,14 @@ class PriceFetcher:
     """Fetches real-time crypto and fiat prices"""
     
     def __init__(self):
+        # Pooled session: keeps the TLS connection alive across the
+        # CoinGecko and Yahoo calls and retries transient failures
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
         self.btc_price: Optional[float] = None
         self.btc_change_24h: Optional[float] = None
         self.dxy_price: Optional[float] = None
@@ -38,7 +50,7 @@ class PriceFetcher:
                 'accept': 'application/json'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.session.get(url, params=params, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -77,7 +89,7 @@ class PriceFetcher:
                 headers = {
                     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
                 }
-                response = requests.get(url, headers=headers, timeout=10)
+                response = self.session.get(url, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -105,13 +117,15 @@ class PriceFetcher:
     def fetch_all(self) -> Dict:
         """Fetch all prices"""
         self.last_update = datetime.now(BJ_TIMEZONE)
-        
-        # Fetch BTC
-        self.fetch_btc_price()
-        
-        # Fetch DXY
-        self.fetch_dxy_price()
-        
+
+        # BTC and DXY hit independent endpoints and write disjoint
+        # attributes — overlap the two round trips
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            btc_future = executor.submit(self.fetch_btc_price)
+            dxy_future = executor.submit(self.fetch_dxy_price)
+            btc_future.result()
+            dxy_future.result()
+
         return {
             'btc': {
                 'price': self.btc_price,
@@ -141,10 +155,22 @@ class PriceFetcher:
         return ""
 
 
+# Prices move on the scale of minutes; short-lived memoization keeps
+# repeated callers from hammering CoinGecko's rate limit
+_PRICE_CACHE = {'ts': 0.0, 'val': None}
+_PRICE_TTL = 60.0
+
+
 def get_market_prices() -> Dict:
-    """Convenience function to get current market prices"""
+    """Convenience function to get current market prices (60s cache)"""
+    if _PRICE_CACHE['val'] is not None and time.time() - _PRICE_CACHE['ts'] < _PRICE_TTL:
+        return _PRICE_CACHE['val']
+
     fetcher = PriceFetcher()
-    return fetcher.fetch_all()
+    prices = fetcher.fetch_all()
+    _PRICE_CACHE['ts'] = time.time()
+    _PRICE_CACHE['val'] = prices
+    return prices
 
 
 if __name__ == "__main__":
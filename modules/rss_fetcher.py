@@ -5,16 +5,36 @@ Fetches crypto news from various RSS feeds
 
 import feedparser
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict
 import hashlib
+import json
 import re
 
+try:
+    import ahocorasick
+except ImportError:  # optional; substring fallback below
+    ahocorasick = None
+
+try:
+    # xxh3 hashes short URLs ~10x faster than md5; the digest is only
+    # a dedup key, not a security boundary
+    import xxhash
+    _hash_url = xxhash.xxh3_128_hexdigest
+except ImportError:
+    def _hash_url(data):
+        return hashlib.md5(data).hexdigest()
+
 logger = logging.getLogger(__name__)
 
 # Beijing timezone for display
 BJ_TIMEZONE = timezone(timedelta(hours=8))
 
+# Compiled once; clean_text runs on every title/summary
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class RSSFetcher:
     """Fetches and parses RSS feeds for crypto news"""
@@ -24,19 +44,53 @@ class RSSFetcher:
         self.feeds = config.get('rss_sources', [])
         self.crypto_keywords = config.get('crypto_keywords', [])
         self.lookback_hours = config.get('hours_lookback', 2)
-    
+
+        # Conditional-GET state (ETag/Last-Modified per feed URL), so
+        # unchanged feeds come back as a tiny 304 instead of a full body
+        self._feed_state_path = '.feed_state.json'
+        try:
+            with open(self._feed_state_path, 'r') as f:
+                self._feed_state = json.load(f)
+        except Exception:
+            self._feed_state = {}
+
+        # Lowercase the keyword list once instead of per article per keyword
+        self._keywords_lower = tuple(kw.lower() for kw in self.crypto_keywords)
+
+        # Aho-Corasick matches all keywords in one scan of the text
+        # instead of one substring search per keyword
+        self._kw_automaton = None
+        if ahocorasick is not None and self.crypto_keywords:
+            automaton = ahocorasick.Automaton()
+            for kw in self.crypto_keywords:
+                automaton.add_word(kw.lower(), 1)
+            automaton.make_automaton()
+            self._kw_automaton = automaton
+
     def is_crypto_related(self, title: str, summary: str = "") -> bool:
         """Check if content is crypto-related based on keywords"""
         text = f"{title} {summary}".lower()
-        return any(kw.lower() in text for kw in self.crypto_keywords)
+        if self._kw_automaton is not None:
+            return next(self._kw_automaton.iter(text), None) is not None
+        return any(kw in text for kw in self._keywords_lower)
     
     def get_article_hash(self, url: str) -> str:
         """Generate unique hash for article deduplication"""
-        return hashlib.md5(url.encode()).hexdigest()
+        return _hash_url(url.encode())
     
     def parse_date(self, entry) -> datetime:
         """Parse date from feed entry, converting to Beijing time"""
         try:
+            # Fast path: RFC-822 pubDate string via the C-backed stdlib parser
+            published = entry.get('published') if hasattr(entry, 'get') else None
+            if published:
+                try:
+                    dt = parsedate_to_datetime(published)
+                    if dt.tzinfo is None:
+                        dt = dt.replace(tzinfo=timezone.utc)
+                    return dt.astimezone(BJ_TIMEZONE)
+                except (TypeError, ValueError):
+                    pass
             if hasattr(entry, 'published_parsed') and entry.published_parsed:
                 # published_parsed is UTC time (struct_time)
                 utc_dt = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
@@ -57,8 +111,13 @@ class RSSFetcher:
     
     def clean_text(self, text: str, max_length: int = 200) -> str:
         """Clean and truncate text"""
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        # Only max_length chars survive anyway — don't strip tags in a
+        # full-article body (4x overshoot covers removed markup)
+        if len(text) > 4 * max_length:
+            text = text[:4 * max_length]
+        # Remove HTML tags (most titles carry none — skip the regex then)
+        if '<' in text:
+            text = _TAG_RE.sub('', text)
         # Remove extra whitespace
         text = ' '.join(text.split())
         # Truncate if needed
@@ -76,8 +135,19 @@ class RSSFetcher:
         
         try:
             logger.info(f"Fetching RSS feed: {feed_info['name']}")
-            feed = feedparser.parse(feed_info['url'])
-            
+            url = feed_info['url']
+            prev = self._feed_state.get(url, {})
+            feed = feedparser.parse(url, etag=prev.get('etag'), modified=prev.get('modified'))
+
+            if getattr(feed, 'status', None) == 304:
+                logger.info(f"↻ {feed_info['name']}: not modified")
+                return articles
+
+            etag = getattr(feed, 'etag', None)
+            modified = getattr(feed, 'modified', None)
+            if etag or modified:
+                self._feed_state[url] = {'etag': etag, 'modified': modified}
+
             if feed.bozo:
                 logger.warning(f"Malformed XML in {feed_info['name']}: {feed.bozo_exception}")
             
@@ -122,14 +192,34 @@ class RSSFetcher:
         
         return articles
     
+    def _save_feed_state(self):
+        """Persist ETag/Last-Modified state for the next run"""
+        try:
+            with open(self._feed_state_path, 'w') as f:
+                json.dump(self._feed_state, f)
+        except Exception as e:
+            logger.debug(f"Failed to save feed state: {e}")
+
     def fetch_all(self) -> List[Dict]:
-        """Fetch crypto news from all enabled RSS feeds"""
+        """Fetch crypto news from all enabled RSS feeds in parallel"""
         all_articles = []
-        
-        for feed in self.feeds:
-            articles = self.fetch_feed(feed)
-            all_articles.extend(articles)
-        
+
+        if not self.feeds:
+            return all_articles
+
+        # Feed fetching is pure network wait; overlap it so total time
+        # is ~the slowest feed instead of the sum of all of them
+        with ThreadPoolExecutor(max_workers=min(10, len(self.feeds))) as executor:
+            futures = {executor.submit(self.fetch_feed, feed): feed for feed in self.feeds}
+            for future in as_completed(futures):
+                feed = futures[future]
+                try:
+                    all_articles.extend(future.result())
+                except Exception as e:
+                    logger.error(f"✗ Error fetching {feed.get('name', 'Unknown')}: {e}")
+
+        self._save_feed_state()
+
         # Sort by priority (higher priority = more trusted source)
         all_articles.sort(key=lambda x: (-x['source_priority'], x['published']), reverse=True)
         
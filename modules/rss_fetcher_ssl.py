@@ -2,15 +2,39 @@
 RSS Fetcher with SSL workaround for environments with certificate issues
 """
 
-import feedparser
+try:
+    # lxml-backed drop-in with the same entries/bozo API, ~10x faster
+    # XML tokenization than pure-Python feedparser
+    import fastfeedparser as feedparser
+except ImportError:
+    import feedparser
+import calendar
+import json
 import logging
 import ssl
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict
 import hashlib
 import re
 
+try:
+    import ahocorasick
+except ImportError:  # optional; substring fallback below
+    ahocorasick = None
+
+try:
+    # xxh3 hashes short URLs ~10x faster than md5; the digest is only
+    # a dedup key, not a security boundary
+    import xxhash
+    _hash_url = xxhash.xxh3_128_hexdigest
+except ImportError:
+    def _hash_url(data):
+        return hashlib.md5(data).hexdigest()
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +42,9 @@ logger = logging.getLogger(__name__)
 # Beijing timezone for display
 BJ_TIMEZONE = timezone(timedelta(hours=8))
 
+# Compiled once; clean_text runs on every title/summary
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 # Create SSL context that doesn't verify certificates (for dev environments)
 def create_unverified_ssl_context():
@@ -28,23 +55,12 @@ def create_unverified_ssl_context():
     return context
 
 
-# Monkey patch feedparser to use unverified SSL
-_original_urlopen = urllib.request.urlopen
-
-def _patched_urlopen(url, *args, **kwargs):
-    """Patched urlopen that doesn't verify SSL certificates"""
-    try:
-        return _original_urlopen(url, *args, **kwargs, context=create_unverified_ssl_context())
-    except (ssl.SSLCertVerificationError, urllib.error.URLError) as e:
-        logger.debug(f"SSL error with {url}, retrying with verification disabled: {e}")
-        import urllib.request
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return response
-
-
-# Apply patch
-urllib.request.urlopen = _patched_urlopen
+# One opener carrying the relaxed SSL context, built once and used only
+# by this module's downloads. Scoping it here (rather than
+# install_opener, which changes urllib behaviour process-wide) keeps
+# certificate verification intact for every other caller.
+_SSL_CONTEXT = create_unverified_ssl_context()
+_OPENER = urllib.request.build_opener(urllib.request.HTTPSHandler(context=_SSL_CONTEXT))
 
 
 class RSSFetcher:
@@ -64,7 +80,56 @@ class RSSFetcher:
             self.lookback_hours = processing_config.get('hours_lookback',
                                                          config.get('hours_lookback', 24))
             self.cutoff_timestamp = datetime.now(BJ_TIMEZONE) - timedelta(hours=self.lookback_hours)
-    
+
+        # Conditional-GET state (ETag/Last-Modified per feed URL), so
+        # unchanged feeds come back as a tiny 304 instead of a full
+        # body. Same file as modules/rss_fetcher so hits are shared.
+        self._feed_state_path = '.feed_state.json'
+        try:
+            with open(self._feed_state_path, 'r') as f:
+                self._feed_state = json.load(f)
+        except Exception:
+            self._feed_state = {}
+
+        # Epoch form of the cutoff lets the entry loop reject old items
+        # with one float comparison, before building any datetime
+        self._cutoff_epoch = self.cutoff_timestamp.timestamp()
+
+        # Lowercase the keyword lists once instead of per article per
+        # keyword (fallback path when pyahocorasick is absent)
+        self._kw_lower = tuple(
+            (kw.lower(), kw, self._keyword_weight(kw)) for kw in self.crypto_keywords
+        )
+        self._excl_lower = tuple(kw.lower() for kw in self.exclude_keywords)
+
+        # Aho-Corasick automata scan the text once for every keyword at
+        # the same time, instead of one substring search per keyword.
+        # Payloads carry (keyword, weight) so scoring stays identical.
+        self._kw_automaton = None
+        self._excl_automaton = None
+        if ahocorasick is not None:
+            if self.crypto_keywords:
+                automaton = ahocorasick.Automaton()
+                for kw in self.crypto_keywords:
+                    automaton.add_word(kw.lower(), (kw, self._keyword_weight(kw)))
+                automaton.make_automaton()
+                self._kw_automaton = automaton
+            if self.exclude_keywords:
+                automaton = ahocorasick.Automaton()
+                for kw in self.exclude_keywords:
+                    automaton.add_word(kw.lower(), kw)
+                automaton.make_automaton()
+                self._excl_automaton = automaton
+
+    @staticmethod
+    def _keyword_weight(kw: str) -> int:
+        """Relevance weight for a crypto keyword"""
+        if kw in ['bitcoin', 'ethereum', 'btc', 'eth']:  # Core crypto terms
+            return 3
+        elif kw in ['crypto', 'cryptocurrency', 'blockchain']:  # General terms
+            return 2
+        return 1  # Specific terms
+
     def is_crypto_related(self, title: str = "", summary: str = "", source_name: str = "", crypto_only: bool = False) -> bool:
         """Check if content is crypto-related using enhanced keyword analysis"""
         if not title and not summary:
@@ -73,25 +138,28 @@ class RSSFetcher:
         text = f"{title} {summary}".lower()
 
         # First, check for exclusion keywords - if they appear prominently, likely not crypto
-        exclude_score = sum(1 for kw in self.exclude_keywords if kw.lower() in text)
+        if self._excl_automaton is not None:
+            exclude_score = len({kw for _, kw in self._excl_automaton.iter(text)})
+        else:
+            exclude_score = sum(1 for kw in self._excl_lower if kw in text)
         if exclude_score >= 2:  # Multiple finance/stock mentions suggest non-crypto content
             logger.debug(f"Filtered out (exclusion keywords): '{title[:50]}...'")
             return False
 
-        # Check for crypto keywords with scoring system
-        crypto_score = 0
-        found_keywords = []
-
-        for kw in self.crypto_keywords:
-            if kw.lower() in text:
-                found_keywords.append(kw)
-                # Weight different types of keywords differently
-                if kw in ['bitcoin', 'ethereum', 'btc', 'eth']:  # Core crypto terms
-                    crypto_score += 3
-                elif kw in ['crypto', 'cryptocurrency', 'blockchain']:  # General terms
-                    crypto_score += 2
-                else:  # Specific terms
-                    crypto_score += 1
+        # Check for crypto keywords with scoring system. Each keyword
+        # counts once however many times it occurs, matching the old
+        # per-keyword substring behaviour.
+        if self._kw_automaton is not None:
+            found = dict(payload for _, payload in self._kw_automaton.iter(text))
+            crypto_score = sum(found.values())
+            found_keywords = list(found)
+        else:
+            crypto_score = 0
+            found_keywords = []
+            for kw_lower, kw, weight in self._kw_lower:
+                if kw_lower in text:
+                    found_keywords.append(kw)
+                    crypto_score += weight
 
         # For crypto-only sources, require at least 1 crypto keyword
         # For other sources, require at least 2 crypto relevance score
@@ -106,8 +174,17 @@ class RSSFetcher:
     
     def get_article_hash(self, url: str) -> str:
         """Generate unique hash for article deduplication"""
-        return hashlib.md5(url.encode()).hexdigest()
+        return _hash_url(url.encode())
     
+    @staticmethod
+    def _entry_epoch(entry) -> float:
+        """Entry publish time as a Unix epoch, or None if unavailable"""
+        for attr in ('published_parsed', 'updated_parsed'):
+            parsed = getattr(entry, attr, None)
+            if parsed:
+                return calendar.timegm(parsed)
+        return None
+
     def parse_date(self, entry) -> datetime:
         """Parse date from feed entry, converting to Beijing time"""
         try:
@@ -125,15 +202,15 @@ class RSSFetcher:
                     dt = dt.replace(tzinfo=timezone.utc)
                 return dt.astimezone(BJ_TIMEZONE)
             elif hasattr(entry, 'published') and entry.published:
+                # One stdlib call instead of trying strptime formats in a loop
                 date_str = entry.published
-                for fmt in ['%a, %d %b %Y %H:%M:%S %z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S']:
-                    try:
-                        dt = datetime.strptime(date_str, fmt)
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        return dt.astimezone(BJ_TIMEZONE)
-                    except:
-                        continue
+                try:
+                    dt = parsedate_to_datetime(date_str)
+                except (TypeError, ValueError):
+                    dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
+                return dt.astimezone(BJ_TIMEZONE)
         except Exception as e:
             logger.debug(f"Failed to parse date: {e}")
         # Fallback to current Beijing time
@@ -143,24 +220,72 @@ class RSSFetcher:
         """Clean and truncate text"""
         if not text:
             return ""
-        
-        text = re.sub(r'<[^>]+>', '', text)
+
+        # Only max_length chars survive anyway — don't strip tags in a
+        # full-article body (4x overshoot covers removed markup)
+        if len(text) > 4 * max_length:
+            text = text[:4 * max_length]
+        # Most titles carry no HTML — skip the regex then
+        if '<' in text:
+            text = _TAG_RE.sub('', text)
         text = ' '.join(text.split())
         if len(text) > max_length:
             text = text[:max_length] + "..."
         return text.strip()
     
-    def fetch_feed(self, feed_info: dict) -> List[Dict]:
-        """Fetch and parse a single RSS feed"""
+    def _download_feed(self, url: str) -> bytes:
+        """Download raw feed bytes (network only, no parsing)
+
+        Sends If-None-Match/If-Modified-Since from the previous run and
+        returns None when the server answers 304 Not Modified.
+        """
+        prev = self._feed_state.get(url, {})
+        headers = {}
+        if prev.get('etag'):
+            headers['If-None-Match'] = prev['etag']
+        if prev.get('modified'):
+            headers['If-Modified-Since'] = prev['modified']
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with _OPENER.open(request, timeout=30) as resp:
+                raw = resp.read()
+                etag = resp.headers.get('ETag')
+                modified = resp.headers.get('Last-Modified')
+                if etag or modified:
+                    self._feed_state[url] = {'etag': etag, 'modified': modified}
+                return raw
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None
+            raise
+
+    def _save_feed_state(self):
+        """Persist ETag/Last-Modified state for the next run"""
+        try:
+            with open(self._feed_state_path, 'w') as f:
+                json.dump(self._feed_state, f)
+        except Exception as e:
+            logger.debug(f"Failed to save feed state: {e}")
+
+    def fetch_feed(self, feed_info: dict, raw: bytes = None) -> List[Dict]:
+        """Parse a single RSS feed (from pre-downloaded bytes if given)"""
         articles = []
-        
+
         if not feed_info.get('enabled', True):
             logger.debug(f"Feed disabled: {feed_info['name']}")
             return articles
-        
+
         try:
             logger.info(f"Fetching RSS feed: {feed_info['name']}")
-            feed = feedparser.parse(feed_info['url'])
+            if raw is None:
+                # Retry the download ourselves so feedparser never has
+                # to fetch the URL (its urllib path would verify certs)
+                raw = self._download_feed(feed_info['url'])
+                if raw is None:
+                    logger.info(f"↻ {feed_info['name']}: not modified")
+                    return articles
+            feed = feedparser.parse(raw)
             
             if feed.bozo:
                 logger.warning(f"Malformed XML in {feed_info['name']}")
@@ -168,6 +293,12 @@ class RSSFetcher:
             crypto_only = feed_info.get('crypto_only', False)
 
             for entry in feed.entries[:50]:
+                # Cheap epoch comparison first: most entries predate the
+                # cutoff and never need a timezone-aware datetime built
+                epoch = self._entry_epoch(entry)
+                if epoch is not None and epoch <= self._cutoff_epoch:
+                    continue
+
                 pub_date = self.parse_date(entry)
 
                 if pub_date <= self.cutoff_timestamp:
@@ -201,13 +332,38 @@ class RSSFetcher:
         return articles
     
     def fetch_all(self) -> List[Dict]:
-        """Fetch crypto news from all enabled RSS feeds"""
+        """Fetch crypto news from all enabled RSS feeds
+
+        Downloads overlap on a thread pool (pure network wait) while
+        parsing stays serial, so feedparser's memory peak is bounded to
+        one feed at a time.
+        """
         all_articles = []
-        
-        for feed in self.feeds:
-            articles = self.fetch_feed(feed)
+        enabled = [f for f in self.feeds if f.get('enabled', True)]
+
+        raw_by_name = {}
+        if enabled:
+            with ThreadPoolExecutor(max_workers=min(8, len(enabled))) as executor:
+                futures = {executor.submit(self._download_feed, f['url']): f['name'] for f in enabled}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        raw_by_name[name] = future.result()
+                    except Exception as e:
+                        # fetch_feed retries the download once more itself
+                        logger.warning(f"Download failed for {name}: {e}")
+
+        for feed in enabled:
+            name = feed['name']
+            if name in raw_by_name and raw_by_name[name] is None:
+                # Conditional GET answered 304 — nothing new to parse
+                logger.info(f"↻ {name}: not modified")
+                continue
+            articles = self.fetch_feed(feed, raw_by_name.get(name))
             all_articles.extend(articles)
-        
+
+        self._save_feed_state()
+
         all_articles.sort(key=lambda x: (-x['source_priority'], x['published']), reverse=True)
         
         logger.info(f"Total: Fetched {len(all_articles)} articles from {len(self.feeds)} feeds")
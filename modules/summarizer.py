@@ -4,15 +4,51 @@ Uses AI to summarize articles (optional)
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
 import re
+import shelve
+import time
 import requests
-from typing import List, Dict
+from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 
+try:
+    # C-backed HTML parser, roughly an order of magnitude faster than
+    # BeautifulSoup on full article pages
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+# Compiled once; runs on every fetched article body
+_WS_RE = re.compile(r'\s+')
+
+# Common main-content selectors, tried most-specific first
+_CONTENT_SELECTORS = (
+    'article',
+    '[role="main"]',
+    '.article-content',
+    '.post-content',
+    '.entry-content',
+    '.content-body',
+    '.story-body',
+    'main',
+)
+
+# Same store and policy as the Actions runner, so both entry points
+# share hits: wire stories reappear across overlapping runs and would
+# otherwise be re-summarized every 8 hours
+_CACHE_DIR = ".cache"
+_CACHE_MAX_AGE = 7 * 24 * 3600  # 7 days
+
+# Articles per DeepSeek request: large enough to amortize the request
+# overhead, small enough that one malformed reply doesn't cost much
+_BATCH_SIZE = 6
+
 
 class ArticleSummarizer:
     """Summarizes articles using AI"""
@@ -23,7 +59,36 @@ class ArticleSummarizer:
         self.model = config.get('model', 'deepseek-chat')
         self.summary_length = config.get('summary_length', 100)
         self.detail_length = config.get('detail_length', 200)
-    
+
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            self._cache = shelve.open(os.path.join(_CACHE_DIR, "summaries.db"))
+        except Exception as e:
+            logger.debug(f"Summary cache unavailable: {e}")
+            self._cache = None
+
+    def _cache_key(self, title: str, url: str) -> str:
+        return hashlib.blake2b((title + url).encode(), digest_size=16).hexdigest()
+
+    def _cache_get(self, title: str, url: str) -> Optional[Dict[str, str]]:
+        if self._cache is None:
+            return None
+        try:
+            entry = self._cache.get(self._cache_key(title, url))
+        except Exception:
+            return None
+        if entry and time.time() - entry[1] <= _CACHE_MAX_AGE:
+            return entry[0]
+        return None
+
+    def _cache_put(self, title: str, url: str, result: Dict[str, str]) -> None:
+        if self._cache is None:
+            return
+        try:
+            self._cache[self._cache_key(title, url)] = (result, time.time())
+        except Exception as e:
+            logger.debug(f"Summary cache write failed: {e}")
+
     def fetch_article_content(self, url: str, source: str) -> str:
         """Fetch article content from URL"""
         try:
@@ -32,42 +97,46 @@ class ArticleSummarizer:
             }
             response = requests.get(url, headers=headers, timeout=15)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove scripts and styles
-            for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-                script.decompose()
-            
-            # Try to find main content based on common selectors
-            content = None
-            selectors = [
-                'article',
-                '[role="main"]',
-                '.article-content',
-                '.post-content',
-                '.entry-content',
-                '.content-body',
-                '.story-body',
-                'main'
-            ]
-            
-            for selector in selectors:
-                content = soup.select_one(selector)
-                if content and len(content.get_text(strip=True)) > 200:
-                    break
-            
-            if not content:
-                content = soup.find('body')
-            
-            if content:
-                # Get text and clean it
-                text = content.get_text(separator=' ', strip=True)
+
+            if HTMLParser is not None:
+                tree = HTMLParser(response.content)
+                tree.strip_tags(['script', 'style', 'nav', 'footer', 'header'])
+
+                content = None
+                for selector in _CONTENT_SELECTORS:
+                    node = tree.css_first(selector)
+                    if node and len(node.text(strip=True)) > 200:
+                        content = node
+                        break
+
+                if content is None:
+                    content = tree.body
+                text = content.text(separator=' ', strip=True) if content else ""
+            else:
+                soup = BeautifulSoup(response.content, 'html.parser')
+
+                # Remove scripts and styles
+                for script in soup(['script', 'style', 'nav', 'footer', 'header']):
+                    script.decompose()
+
+                # Try to find main content based on common selectors
+                content = None
+                for selector in _CONTENT_SELECTORS:
+                    content = soup.select_one(selector)
+                    if content and len(content.get_text(strip=True)) > 200:
+                        break
+
+                if not content:
+                    content = soup.find('body')
+
+                text = content.get_text(separator=' ', strip=True) if content else ""
+
+            if text:
                 # Remove extra whitespace
-                text = re.sub(r'\s+', ' ', text).strip()
+                text = _WS_RE.sub(' ', text).strip()
                 # Limit length
                 return text[:3000] if len(text) > 3000 else text
-            
+
             return ""
             
         except Exception as e:
@@ -76,8 +145,6 @@ class ArticleSummarizer:
     
     def summarize_articles(self, articles: List[Dict]) -> List[Dict]:
         """Summarize articles using DeepSeek if configured"""
-        import asyncio
-        
         use_deepseek = os.environ.get('DEEPSEEK_API_KEY')
         
         if not use_deepseek:
@@ -92,30 +159,10 @@ class ArticleSummarizer:
         
         return articles
     
-    async def summarize_with_deepseek(self, articles: List[Dict]) -> List[Dict]:
-        """Fetch article content and summarize using DeepSeek API"""
-        try:
-            from openai import OpenAI
-            
-            api_key = os.environ.get('DEEPSEEK_API_KEY')
-            if not api_key:
-                logger.warning("DEEPSEEK_API_KEY not set")
-                return articles
-            
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com"
-            )
-            
-            for i, article in enumerate(articles):
-                logger.info(f"Processing {i+1}/{len(articles)}: {article['title'][:40]}...")
-                
-                # 1. Fetch article content from URL
-                content = self.fetch_article_content(article['url'], article.get('source', ''))
-                
-                # 2. Generate summary with DeepSeek
-                if content:
-                    prompt = f"""
+    def _build_prompt(self, article: Dict, content: str) -> str:
+        """Build the translate-and-summarize prompt for one article"""
+        if content:
+            return f"""
 请用中文完成以下任务：
 
 1. 将标题翻译成简洁的中文（不超过25字）
@@ -131,9 +178,8 @@ class ArticleSummarizer:
 标题翻译：[中文标题]
 摘要：[不超过100字的摘要]
 """
-                else:
-                    # Use title as summary if can't fetch content
-                    prompt = f"""
+        # Use title as summary if can't fetch content
+        return f"""
 请用中文完成以下任务：
 
 1. 将标题翻译成简洁的中文（不超过25字）
@@ -146,34 +192,153 @@ class ArticleSummarizer:
 标题翻译：[中文标题]
 摘要：[不超过100字的摘要]
 """
-                
-                response = client.chat.completions.create(
-                    model="deepseek-chat",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=300
-                )
-                
-                result = response.choices[0].message.content.strip()
-                
-                # Parse the result
-                title_cn = article['title']  # Default to original
-                summary = article.get('summary', '')
-                
-                for line in result.split('\n'):
-                    if line.startswith('标题翻译：'):
-                        title_cn = line.replace('标题翻译：', '').strip()
-                    elif line.startswith('摘要：'):
-                        summary = line.replace('摘要：', '').strip()
-                
-                article['title_cn'] = title_cn
-                article['summary'] = summary
-                logger.debug(f"Summarized: {article['title'][:30]}...")
-        
+
+    def _apply_result(self, article: Dict, result: str) -> None:
+        """Parse a model reply and write title_cn/summary onto the article"""
+        title_cn = article['title']  # Default to original
+        summary = article.get('summary', '')
+
+        for line in result.split('\n'):
+            if line.startswith('标题翻译：'):
+                title_cn = line.replace('标题翻译：', '').strip()
+            elif line.startswith('摘要：'):
+                summary = line.replace('摘要：', '').strip()
+
+        article['title_cn'] = title_cn
+        article['summary'] = summary
+        self._cache_put(article['title'], article.get('url', ''),
+                        {'title_cn': title_cn, 'summary': summary})
+
+    def _build_batch_prompt(self, batch: List[Dict], contents: List[str]) -> str:
+        """Build one prompt covering several articles, JSON output"""
+        blocks = []
+        for i, (article, content) in enumerate(zip(batch, contents), 1):
+            block = f"【文章{i}】\n标题：{article['title']}\n来源：{article.get('source', '')}"
+            if content:
+                block += f"\n内容：{content[:1500]}"
+            blocks.append(block)
+        body = "\n\n".join(blocks)
+
+        return f"""
+请用中文处理以下{len(batch)}篇文章。对每篇文章：
+
+1. 将标题翻译成简洁的中文（不超过25字）
+2. 用不超过100个汉字总结文章要点（只保留与加密货币直接相关的内容；若没有正文则根据标题生成摘要）
+
+{body}
+
+请输出 JSON，格式如下：
+{{"articles": [{{"id": 1, "title_cn": "中文标题", "summary": "摘要"}}, ...]}}
+"""
+
+    async def summarize_with_deepseek(self, articles: List[Dict]) -> List[Dict]:
+        """Fetch article content and summarize using DeepSeek API
+
+        Uncached articles are grouped into batches of _BATCH_SIZE, one
+        API request per batch, and batches run concurrently under a
+        semaphore. A batch whose JSON reply can't be parsed is split in
+        half and retried; single articles fall back to the plain-text
+        per-article prompt.
+        """
+        try:
+            from openai import AsyncOpenAI
+
+            api_key = os.environ.get('DEEPSEEK_API_KEY')
+            if not api_key:
+                logger.warning("DEEPSEEK_API_KEY not set")
+                return articles
+
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url="https://api.deepseek.com"
+            )
+
+            semaphore = asyncio.Semaphore(8)
+            loop = asyncio.get_running_loop()
+
+            # Persistent cache hits skip fetch + API call entirely
+            pending = []
+            for article in articles:
+                cached = self._cache_get(article['title'], article.get('url', ''))
+                if cached:
+                    article['title_cn'] = cached['title_cn']
+                    article['summary'] = cached['summary']
+                    logger.debug(f"Cache hit: {article['title'][:30]}...")
+                else:
+                    pending.append(article)
+
+            if not pending:
+                return articles
+
+            async def summarize_single(article: Dict, content: str) -> None:
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        model="deepseek-chat",
+                        messages=[{"role": "user", "content": self._build_prompt(article, content)}],
+                        max_tokens=300
+                    )
+                self._apply_result(article, response.choices[0].message.content.strip())
+
+            async def summarize_batch(batch: List[Dict], contents: List[str]) -> None:
+                if len(batch) == 1:
+                    await summarize_single(batch[0], contents[0])
+                    return
+
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        model="deepseek-chat",
+                        messages=[{"role": "user", "content": self._build_batch_prompt(batch, contents)}],
+                        max_tokens=300 * len(batch),
+                        response_format={"type": "json_object"}
+                    )
+
+                try:
+                    items = json.loads(response.choices[0].message.content)['articles']
+                    by_id = {int(item['id']): item for item in items}
+                    if set(by_id) != set(range(1, len(batch) + 1)):
+                        raise ValueError(f"expected {len(batch)} items, got ids {sorted(by_id)}")
+                    for i, article in enumerate(batch, 1):
+                        item = by_id[i]
+                        article['title_cn'] = item['title_cn'].strip()
+                        article['summary'] = item['summary'].strip()
+                        self._cache_put(article['title'], article.get('url', ''),
+                                        {'title_cn': article['title_cn'],
+                                         'summary': article['summary']})
+                except (KeyError, TypeError, ValueError) as e:
+                    # Malformed reply: halve the batch and retry both ends
+                    logger.warning(f"Batch of {len(batch)} returned bad JSON ({e}), splitting")
+                    mid = len(batch) // 2
+                    await asyncio.gather(
+                        summarize_batch(batch[:mid], contents[:mid]),
+                        summarize_batch(batch[mid:], contents[mid:])
+                    )
+
+            async def process(batch: List[Dict]) -> None:
+                # Content fetches are blocking requests calls — overlap
+                # them on the default executor before the API request
+                contents = await asyncio.gather(*(
+                    loop.run_in_executor(None, self.fetch_article_content,
+                                         a['url'], a.get('source', ''))
+                    for a in batch
+                ))
+                await summarize_batch(batch, list(contents))
+
+            batches = [pending[i:i + _BATCH_SIZE] for i in range(0, len(pending), _BATCH_SIZE)]
+            logger.info(f"Summarizing {len(pending)} articles in {len(batches)} batches...")
+            results = await asyncio.gather(
+                *(process(batch) for batch in batches),
+                return_exceptions=True
+            )
+            for batch, result in zip(batches, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to summarize batch starting "
+                                 f"'{batch[0]['title'][:40]}': {result}")
+
         except ImportError:
             logger.warning("openai package not installed")
         except Exception as e:
             logger.error(f"Error summarizing with DeepSeek: {e}")
-        
+
         return articles
 
 
@@ -54,47 +54,46 @@ class TelegramBriefingBot:
         """Format articles into a nice briefing"""
         if not articles:
             return "📰 *加密新闻简报*\n\n本周期未找到新文章。"
-        
-        lines = []
-        
-        # Header with prices
-        lines.append("*加密新闻简报*")
-        lines.append(datetime.now(BJ_TIMEZONE).strftime('%Y-%m-%d %H:%M'))
-        lines.append("")
-        
-        # Add market prices if available
-        if prices:
-            price_parts = []
-            btc = prices.get('btc', {})
-            if btc.get('price'):
-                change = btc.get('change_24h', 0)
-                change_str = f"{change:+.2f}%" if change else ""
-                price_parts.append(f"*₿ ${btc['price']:,.0f} {change_str}*")
-            
-            dxy = prices.get('dxy', {})
-            if dxy.get('price'):
-                change = dxy.get('change_24h', 0)
-                change_str = f"{change:+.2f}%" if change else ""
-                price_parts.append(f"DXY {dxy['price']:.2f} {change_str}")
-            
-            if price_parts:
-                lines.append(" ".join(price_parts))
-        
-        lines.append("")
-        
-        # Articles
-        for i, article in enumerate(articles[:10], 1):
-            lines.append(f"*{i} {article.get('title_cn', article.get('title', ''))}*")
-            lines.append(f"{article.get('summary', '')}")
-            url = article.get('url', '')
-            source = article.get('source', '')
-            if url:
-                lines.append(f"[{source}]({url}) | {article['published'].strftime('%H:%M')}")
-            else:
-                lines.append(f"_{source} | {article['published'].strftime('%H:%M')}_")
-            lines.append("")
-        
-        return "\n".join(lines)
+
+        # Single pass, one final join — no intermediate list growth
+        def _emit():
+            # Header with prices
+            yield "*加密新闻简报*"
+            yield datetime.now(BJ_TIMEZONE).strftime('%Y-%m-%d %H:%M')
+            yield ""
+
+            if prices:
+                price_parts = []
+                btc = prices.get('btc', {})
+                if btc.get('price'):
+                    change = btc.get('change_24h', 0)
+                    change_str = f"{change:+.2f}%" if change else ""
+                    price_parts.append(f"*₿ ${btc['price']:,.0f} {change_str}*")
+
+                dxy = prices.get('dxy', {})
+                if dxy.get('price'):
+                    change = dxy.get('change_24h', 0)
+                    change_str = f"{change:+.2f}%" if change else ""
+                    price_parts.append(f"DXY {dxy['price']:.2f} {change_str}")
+
+                if price_parts:
+                    yield " ".join(price_parts)
+
+            yield ""
+
+            for i, article in enumerate(articles[:10], 1):
+                yield f"*{i} {article.get('title_cn', article.get('title', ''))}*"
+                yield f"{article.get('summary', '')}"
+                url = article.get('url', '')
+                source = article.get('source', '')
+                time_str = article['published'].strftime('%H:%M')
+                if url:
+                    yield f"[{source}]({url}) | {time_str}"
+                else:
+                    yield f"_{source} | {time_str}_"
+                yield ""
+
+        return "\n".join(_emit())
     
     async def send_briefing(self, articles: List[Dict], prices: Dict = None) -> bool:
         """Send formatted briefing to Telegram"""